@@ -0,0 +1,25 @@
+import subprocess
+import sys
+import time
+
+MODULES = [
+    'fpc2534',
+    'fpc2534.recorder',
+    'fpc2534.quart_app',
+]
+
+RUNS = 10
+
+def measure(module):
+    timings = []
+    for _ in range(RUNS):
+        started_at = time.perf_counter()
+        subprocess.run([sys.executable, '-c', f'import {module}'], check=True)
+        timings.append(time.perf_counter() - started_at)
+    return min(timings)
+
+if __name__ == '__main__':
+    baseline = measure('sys')
+    print(f'{"interpreter":20} {baseline * 1000:8.1f} ms')
+    for module in MODULES:
+        print(f'{module:20} {(measure(module) - baseline) * 1000:8.1f} ms')
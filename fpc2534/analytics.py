@@ -0,0 +1,95 @@
+import array
+import math
+import time
+
+DEFAULT_CAPACITY = 10000
+
+NO_TEMPLATE = -1
+
+
+class IdentifyAnalytics:
+    # fixed size ring buffers, one slot per identify attempt, oldest get overwritten
+    def __init__(self, capacity=DEFAULT_CAPACITY):
+        self._capacity = capacity
+        self._next = 0
+        self._count = 0
+        self._timestamps = array.array('d', bytes(8 * capacity))
+        self._template_ids = array.array('i', bytes(4 * capacity))
+        self._tags = array.array('H', bytes(2 * capacity))
+        self._results = array.array('b', bytes(capacity))
+        self._latencies = array.array('d', bytes(8 * capacity))
+        self._finger_detected_at = None
+
+    def observe(self, response):
+        # fed with every identify frame, times the way from finger detect to result
+        if response.get('event') == 'EVENT_FINGER_DETECT':
+            self._finger_detected_at = time.monotonic()
+        elif response.get('finger_found') is not None:
+            latency = math.nan if self._finger_detected_at is None else time.monotonic() - self._finger_detected_at
+            self._finger_detected_at = None
+            self.record(response['finger_found'], response['template_id'], response['tag'], latency)
+
+    def record(self, finger_found, template_id, tag, latency=math.nan, timestamp=None):
+        i = self._next
+
+        self._timestamps[i] = time.time() if timestamp is None else timestamp
+        self._template_ids[i] = NO_TEMPLATE if template_id is None else template_id
+        self._tags[i] = tag
+        self._results[i] = int(finger_found)
+        self._latencies[i] = latency
+
+        self._next = (i + 1) % self._capacity
+        self._count = min(self._count + 1, self._capacity)
+
+    def _indices(self):
+        start = (self._next - self._count) % self._capacity
+        return ((start + i) % self._capacity for i in range(self._count))
+
+    def stats(self):
+        templates = {}
+        hours = {}
+
+        for i in self._indices():
+            latency = self._latencies[i]
+            timestamp = self._timestamps[i]
+
+            hour = hours.setdefault(int(timestamp // 3600) * 3600, [0, 0])
+            hour[0] += 1
+            hour[1] += self._results[i]
+
+            if not self._results[i]:
+                continue
+
+            template = templates.setdefault(self._template_ids[i], {
+                'matches': 0,
+                'tag': self._tags[i],
+                'last_seen': 0,
+                'latencies': [],
+            })
+            template['matches'] += 1
+            template['tag'] = self._tags[i]
+            template['last_seen'] = timestamp
+            if not math.isnan(latency):
+                template['latencies'].append(latency)
+
+        for template in templates.values():
+            latencies = template.pop('latencies')
+            template['latency_mean'] = sum(latencies) / len(latencies) if latencies else None
+            template['latency_max'] = max(latencies) if latencies else None
+
+        matches = sum(hour[1] for hour in hours.values())
+
+        return {
+            'attempts': self._count,
+            'capacity': self._capacity,
+            'match_rate': matches / self._count if self._count else None,
+            'templates': templates,
+            'hours': {
+                hour: {
+                    'attempts': attempts,
+                    'matches': matches,
+                    'match_rate': matches / attempts,
+                }
+                for hour, (attempts, matches) in sorted(hours.items())
+            },
+        }
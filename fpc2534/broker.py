@@ -0,0 +1,435 @@
+import asyncio
+import json
+import os
+import struct
+import aiomqtt
+import fpc2534 as fpc2534
+import fpc2534.analytics as analytics
+import fpc2534.enroll as enroll
+import fpc2534.recorder as recorder
+
+REQUEST_TOPIC = 'ble_devices/cb:6f:0f:38:a5:24/383f0000-7947-d815-7830-14f1584109c5/383f0001-7947-d815-7830-14f1584109c5/Set'
+RESPONSE_TOPIC = 'ble_devices/cb:6f:0f:38:a5:24/383f0000-7947-d815-7830-14f1584109c5/383f0002-7947-d815-7830-14f1584109c5'
+
+DEFAULT_SOCKET = '/tmp/fpc2534.sock'
+
+# how long a worker waits for the broker to answer, and between reconnect attempts
+REQUEST_TIMEOUT = 5
+RECONNECT_INTERVAL = 1
+ABORT_TIMEOUT = 5
+
+# every message on the socket is a 1 byte type, a 4 byte request id and a 4 byte length.
+# replies carry the id of the request they answer, everything else uses 0
+HEADER = struct.Struct('<BII')
+
+MSG_ACQUIRE =                             0x01
+MSG_RELEASE =                             0x02
+MSG_GRANTED =                             0x03
+MSG_BUSY =                                0x04
+MSG_FRAME =                               0x05
+MSG_SUBSCRIBE =                           0x06
+MSG_UNSUBSCRIBE =                         0x07
+MSG_IDENTIFY_FRAME =                      0x08
+MSG_IDENTIFY_STARTED =                    0x09
+MSG_IDENTIFY_STATS =                      0x0A
+MSG_ENROLL_START =                        0x0B
+MSG_ENROLL_JOB =                          0x0C
+MSG_ENROLL_FAILED =                       0x0D
+MSG_ENROLL_GET =                          0x0E
+MSG_ENROLL_ABORT =                        0x0F
+MSG_ENROLL_UNKNOWN =                      0x10
+MSG_CONFIG_CHANGED =                      0x11
+
+# offset and wait flag, followed by the job id
+ENROLL_GET = struct.Struct('<IB')
+
+
+def encode_payload(data):
+    return ','.join(map(str, data))
+
+def decode_payload(payload):
+    return bytes(map(int, payload.decode().split(',')))
+
+def write_message(writer, type, payload=b'', request_id=0):
+    writer.write(HEADER.pack(type, request_id, len(payload)) + payload)
+
+async def read_message(reader):
+    type, request_id, length = HEADER.unpack(await reader.readexactly(HEADER.size))
+    return type, request_id, await reader.readexactly(length)
+
+
+class Broker:
+    def __init__(self, sensor, frame_recorder=None, identify_analytics=None):
+        self._sensor = sensor
+        self._frame_recorder = frame_recorder
+        self._identify_analytics = identify_analytics or analytics.IdentifyAnalytics()
+        self._enroll_jobs = enroll.EnrollJobs()
+        self._mqtt_client = None
+        self._owner = None
+        self._subscribers = {}
+        self._infinite_action_queue = asyncio.Queue()
+        self._finite_action_finished = asyncio.Event()
+        self._subscriber_appeared = asyncio.Event()
+
+    async def _publish(self, data):
+        if self._frame_recorder is not None:
+            self._frame_recorder.record(recorder.DIRECTION_OUT, data)
+        await self._mqtt_client.publish(REQUEST_TOPIC, encode_payload(data))
+
+    def _broadcast(self, type, payload=b''):
+        for writer, count in self._subscribers.items():
+            if count > 0:
+                write_message(writer, type, payload)
+
+    def _release(self, writer):
+        if self._owner is not writer:
+            return
+        self._owner = None
+        self._finite_action_finished.set()
+
+    async def loop_messages(self):
+        async with aiomqtt.Client(
+                os.environ.get('MQTT_HOST', 'localhost'),
+                int(os.environ.get('MQTT_PORT', 1883))
+            ) as client:
+            print('connected')
+            self._mqtt_client = client
+            await client.subscribe(RESPONSE_TOPIC)
+            async for message in client.messages:
+                await self.handle_frame(decode_payload(message.payload))
+
+    async def handle_frame(self, frame):
+        if self._frame_recorder is not None:
+            self._frame_recorder.record(recorder.DIRECTION_IN, frame)
+
+        if isinstance(self._owner, asyncio.Queue):
+            # a request the broker runs itself, like an enroll job
+            await self._owner.put(self._sensor.parse_response(frame))
+        elif self._owner is not None:
+            write_message(self._owner, MSG_FRAME, frame)
+        else:
+            await self._infinite_action_queue.put(frame)
+
+    async def identify_loop(self):
+        while True:
+            if sum(self._subscribers.values()) == 0:
+                self._subscriber_appeared.clear()
+                await self._subscriber_appeared.wait()
+                continue
+
+            if self._owner is not None:
+                self._finite_action_finished.clear()
+                await self._finite_action_finished.wait()
+
+            await self._publish(self._sensor.identify_finger())
+            response = self._sensor.parse_response(await self._infinite_action_queue.get())
+
+            if 'STATE_IDENTIFY' not in response.get('states', []):
+                await asyncio.sleep(10)
+
+                continue
+
+            self._broadcast(MSG_IDENTIFY_STARTED)
+
+            while True:
+                self._finite_action_finished.clear()
+                done, pending = await asyncio.wait([
+                    asyncio.create_task(self._finite_action_finished.wait(), name='finite'),
+                    asyncio.create_task(self._infinite_action_queue.get())
+                ], return_when=asyncio.FIRST_COMPLETED)
+
+                done = done.pop()
+                pending.pop().cancel()
+
+                if done.get_name() == 'finite':
+                    # restart identify
+                    break
+
+                frame = done.result()
+                self._broadcast(MSG_IDENTIFY_FRAME, frame)
+
+                response = self._sensor.parse_response(frame)
+                self._identify_analytics.observe(response)
+
+                if response.get('event') == 'EVENT_FINGER_LOST':
+                    # allow to restart identification
+                    break
+
+    async def _abort(self, queue):
+        try:
+            async with asyncio.timeout(ABORT_TIMEOUT):
+                await self._publish(self._sensor.abort())
+                await queue.get()
+        except TimeoutError:
+            pass
+
+    async def _start_enroll(self, writer, request_id, frame):
+        if self._owner is not writer:
+            write_message(writer, MSG_ENROLL_FAILED, json.dumps({'error': 'lock not held'}).encode(), request_id)
+            return
+
+        # take the lock over from the worker, the job outlives its request
+        queue = asyncio.Queue()
+        self._owner = queue
+
+        await self._publish(frame)
+        try:
+            async with asyncio.timeout(REQUEST_TIMEOUT / 2):
+                response = await queue.get()
+        except TimeoutError:
+            response = {'error': 'timeout'}
+
+        if 'STATE_ENROLL' not in response.get('states', []):
+            if writer.is_closing():
+                self._release(queue)
+            else:
+                self._owner = writer
+            write_message(writer, MSG_ENROLL_FAILED, json.dumps(response).encode(), request_id)
+            return
+
+        job = self._enroll_jobs.start(queue.get, lambda: self._abort(queue), lambda: self._release(queue))
+        write_message(writer, MSG_ENROLL_JOB, json.dumps(job.to_json()).encode(), request_id)
+
+    async def _get_enroll_job(self, writer, request_id, payload):
+        offset, wait = ENROLL_GET.unpack_from(payload)
+        job = self._enroll_jobs.get(payload[ENROLL_GET.size:].decode())
+
+        if job is None:
+            write_message(writer, MSG_ENROLL_UNKNOWN, request_id=request_id)
+            return
+
+        if wait:
+            await job.wait(offset)
+        write_message(writer, MSG_ENROLL_JOB, json.dumps(job.to_json(offset)).encode(), request_id)
+
+    async def _abort_enroll_job(self, writer, request_id, payload):
+        job = await self._enroll_jobs.abort(payload.decode())
+
+        if job is None:
+            write_message(writer, MSG_ENROLL_UNKNOWN, request_id=request_id)
+            return
+
+        write_message(writer, MSG_ENROLL_JOB, json.dumps(job.to_json()).encode(), request_id)
+
+    async def handle_worker(self, reader, writer):
+        self._subscribers[writer] = 0
+        try:
+            while True:
+                type, request_id, payload = await read_message(reader)
+
+                if type == MSG_ACQUIRE:
+                    if self._owner is None:
+                        self._owner = writer
+                        write_message(writer, MSG_GRANTED, request_id=request_id)
+                    else:
+                        write_message(writer, MSG_BUSY, request_id=request_id)
+                elif type == MSG_RELEASE:
+                    self._release(writer)
+                elif type == MSG_FRAME:
+                    await self._publish(payload)
+                elif type == MSG_SUBSCRIBE:
+                    self._subscribers[writer] += 1
+                    self._subscriber_appeared.set()
+                elif type == MSG_UNSUBSCRIBE:
+                    self._subscribers[writer] -= 1
+                elif type == MSG_IDENTIFY_STATS:
+                    stats = json.dumps(self._identify_analytics.stats()).encode()
+                    write_message(writer, MSG_IDENTIFY_STATS, stats, request_id)
+                elif type == MSG_CONFIG_CHANGED:
+                    # every other worker has to drop its cached system config
+                    for other in self._subscribers:
+                        if other is not writer:
+                            write_message(other, MSG_CONFIG_CHANGED)
+                elif type == MSG_ENROLL_START:
+                    asyncio.create_task(self._start_enroll(writer, request_id, payload))
+                elif type == MSG_ENROLL_GET:
+                    asyncio.create_task(self._get_enroll_job(writer, request_id, payload))
+                elif type == MSG_ENROLL_ABORT:
+                    asyncio.create_task(self._abort_enroll_job(writer, request_id, payload))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            # a worker that dies mid-request must not leave the sensor locked
+            self._release(writer)
+            del self._subscribers[writer]
+            writer.close()
+
+    async def serve(self, path=DEFAULT_SOCKET):
+        if os.path.exists(path):
+            try:
+                _, writer = await asyncio.open_unix_connection(path)
+            except (ConnectionRefusedError, FileNotFoundError):
+                # left behind by a broker that is gone
+                os.remove(path)
+            else:
+                writer.close()
+                raise RuntimeError(f'Another broker is already serving on {path}')
+
+        server = await asyncio.start_unix_server(self.handle_worker, path)
+
+        asyncio.create_task(self.loop_messages())
+        asyncio.create_task(self.identify_loop())
+
+        async with server:
+            await server.serve_forever()
+
+
+class BrokerClient:
+    def __init__(self, on_frame, on_identify_frame, on_identify_started, on_config_changed=None):
+        self._on_frame = on_frame
+        self._on_identify_frame = on_identify_frame
+        self._on_identify_started = on_identify_started
+        self._on_config_changed = on_config_changed
+        self._path = None
+        self._writer = None
+        self._pending = {}
+        self._next_request_id = 1
+        self._subscriptions = 0
+
+    async def connect(self, path=DEFAULT_SOCKET):
+        self._path = path
+        reader, self._writer = await asyncio.open_unix_connection(path)
+        asyncio.create_task(self._loop_messages(reader))
+
+    async def _loop_messages(self, reader):
+        while True:
+            try:
+                await self._read_messages(reader)
+            except (asyncio.IncompleteReadError, ConnectionError):
+                pass
+
+            print('lost connection to broker')
+            self._disconnected()
+            reader = await self._reconnect()
+
+    async def _read_messages(self, reader):
+        while True:
+            type, request_id, payload = await read_message(reader)
+
+            if request_id != 0:
+                future = self._pending.pop(request_id, None)
+                if future is not None and not future.done():
+                    future.set_result((type, payload))
+                elif type == MSG_GRANTED:
+                    # granted after we gave up waiting, hand the lock straight back
+                    self._write(MSG_RELEASE)
+            elif type == MSG_FRAME:
+                await self._on_frame(payload)
+            elif type == MSG_IDENTIFY_FRAME:
+                await self._on_identify_frame(payload)
+            elif type == MSG_IDENTIFY_STARTED:
+                await self._on_identify_started()
+            elif type == MSG_CONFIG_CHANGED and self._on_config_changed is not None:
+                self._on_config_changed()
+
+    def _disconnected(self):
+        self._writer.close()
+        self._writer = None
+
+        if self._on_config_changed is not None:
+            # changes made while we are disconnected would go unnoticed
+            self._on_config_changed()
+
+        for future in self._pending.values():
+            if not future.done():
+                future.set_exception(ConnectionError('Lost connection to broker'))
+        self._pending.clear()
+
+    async def _reconnect(self):
+        while True:
+            await asyncio.sleep(RECONNECT_INTERVAL)
+            try:
+                reader, self._writer = await asyncio.open_unix_connection(self._path)
+            except OSError:
+                continue
+
+            print('reconnected to broker')
+            # the broker forgot about our identify subscribers along with the connection
+            for _ in range(self._subscriptions):
+                self._write(MSG_SUBSCRIBE)
+            return reader
+
+    def _write(self, type, payload=b'', request_id=0):
+        if self._writer is None:
+            raise ConnectionError('Not connected to broker')
+        write_message(self._writer, type, payload, request_id)
+
+    async def _request(self, type, payload=b'', timeout=REQUEST_TIMEOUT):
+        request_id = self._next_request_id
+        self._next_request_id = request_id % 0xFFFFFFFF + 1
+
+        future = asyncio.get_running_loop().create_future()
+        self._write(type, payload, request_id)
+        self._pending[request_id] = future
+
+        try:
+            async with asyncio.timeout(timeout):
+                return await future
+        finally:
+            self._pending.pop(request_id, None)
+
+    async def acquire(self):
+        type, _ = await self._request(MSG_ACQUIRE)
+        return type == MSG_GRANTED
+
+    async def identify_stats(self):
+        _, payload = await self._request(MSG_IDENTIFY_STATS)
+        return json.loads(payload)
+
+    async def start_enroll_job(self, frame):
+        # the broker waits on the sensor and may have to abort, give it some slack
+        type, payload = await self._request(MSG_ENROLL_START, bytes(frame), REQUEST_TIMEOUT + ABORT_TIMEOUT)
+        if type == MSG_ENROLL_JOB:
+            return json.loads(payload), None
+        return None, json.loads(payload)
+
+    async def enroll_job(self, job_id, offset=0, wait=False):
+        type, payload = await self._request(MSG_ENROLL_GET, ENROLL_GET.pack(offset, wait) + job_id.encode())
+        return json.loads(payload) if type == MSG_ENROLL_JOB else None
+
+    async def abort_enroll_job(self, job_id):
+        type, payload = await self._request(MSG_ENROLL_ABORT, job_id.encode(), REQUEST_TIMEOUT + ABORT_TIMEOUT)
+        return json.loads(payload) if type == MSG_ENROLL_JOB else None
+
+    def release(self):
+        if self._writer is None:
+            # the broker drops the lock of a lost connection by itself
+            return
+        self._write(MSG_RELEASE)
+
+    async def publish(self, data):
+        self._write(MSG_FRAME, bytes(data))
+        await self._writer.drain()
+
+    def config_changed(self):
+        if self._writer is not None:
+            self._write(MSG_CONFIG_CHANGED)
+
+    def subscribe(self):
+        self._subscriptions += 1
+        if self._writer is not None:
+            self._write(MSG_SUBSCRIBE)
+
+    def unsubscribe(self):
+        self._subscriptions -= 1
+        if self._writer is not None:
+            self._write(MSG_UNSUBSCRIBE)
+
+
+async def main():
+    key = os.environ.get('FPC2534_KEY')
+    if key:
+        key = bytes.fromhex(key)
+
+    record_path = os.environ.get('FPC2534_RECORD')
+    frame_recorder = recorder.Recorder(record_path) if record_path else None
+
+    identify_analytics = analytics.IdentifyAnalytics(
+        int(os.environ.get('FPC2534_ANALYTICS_SIZE', analytics.DEFAULT_CAPACITY))
+    )
+
+    broker = Broker(fpc2534.FPC2534(key), frame_recorder, identify_analytics)
+    await broker.serve(os.environ.get('FPC2534_BROKER', DEFAULT_SOCKET))
+
+if __name__ == '__main__':
+    asyncio.run(main())
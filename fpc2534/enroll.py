@@ -0,0 +1,120 @@
+import asyncio
+import collections
+import uuid
+
+ENROLL_JOB_TIMEOUT = 300
+ENROLL_JOB_LOG_SIZE = 64
+MAX_ENROLL_JOBS = 32
+
+# upper bound for a single long poll, has to stay below the broker request timeout
+WAIT_TIMEOUT = 3
+
+
+class EnrollJob:
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.state = 'running'
+        self.task = None
+        # bounded log, offset is the absolute index of its first entry
+        self.events = collections.deque(maxlen=ENROLL_JOB_LOG_SIZE)
+        self.offset = 0
+        self.changed = asyncio.Event()
+
+    def append(self, event):
+        if len(self.events) == self.events.maxlen:
+            self.offset += 1
+        self.events.append(event)
+
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    def finish(self, state):
+        self.state = state
+
+        self.changed.set()
+        self.changed = asyncio.Event()
+
+    def since(self, offset):
+        start = max(offset, self.offset)
+        return start, list(self.events)[start - self.offset:]
+
+    async def wait(self, offset, timeout=WAIT_TIMEOUT):
+        # returns once there is something at or past offset, the job ended, or timeout passed
+        try:
+            async with asyncio.timeout(timeout):
+                while self.state == 'running' and self.offset + len(self.events) <= offset:
+                    await self.changed.wait()
+        except TimeoutError:
+            pass
+
+    def to_json(self, offset=0):
+        start, events = self.since(offset)
+        return {
+            'job_id': self.id,
+            'state': self.state,
+            'offset': start,
+            'next_offset': start + len(events),
+            'events': events,
+        }
+
+
+async def run_enroll_job(job, receive, abort, release):
+    # anything unexpected, including a second cancel while aborting, still ends the job
+    state = 'failed'
+    try:
+        async with asyncio.timeout(ENROLL_JOB_TIMEOUT):
+            while True:
+                response = await receive()
+                job.append(response)
+
+                if response.get('feedback') in ['ENROLL_FEEDBACK_PROGRESS', 'ENROLL_FEEDBACK_REJECT_LOW_QUALITY', 'ENROLL_FEEDBACK_PROGRESS_IMMOBILE']:
+                    # right within process
+                    continue
+
+                if response.get('event') in ['EVENT_FINGER_DETECT', 'EVENT_IMAGE_READY', 'EVENT_FINGER_LOST']:
+                    # irrelevant events
+                    continue
+
+                # await FINGER_LOST event
+                await receive()
+
+                state = 'done' if response.get('feedback') == 'ENROLL_FEEDBACK_DONE' else 'failed'
+                break
+    except TimeoutError:
+        state = 'timeout'
+        job.append({'error': 'timeout'})
+        await abort()
+    except asyncio.CancelledError:
+        state = 'aborted'
+        await abort()
+    finally:
+        job.finish(state)
+        release()
+
+
+class EnrollJobs:
+    def __init__(self):
+        self._jobs = {}
+
+    def start(self, receive, abort, release):
+        # forget the oldest finished jobs
+        finished = [job_id for job_id, job in self._jobs.items() if job.state != 'running']
+        for job_id in finished[:max(0, len(self._jobs) - MAX_ENROLL_JOBS + 1)]:
+            del self._jobs[job_id]
+
+        job = EnrollJob()
+        job.append({'event': 'ENROLL_STARTED'})
+        job.task = asyncio.create_task(run_enroll_job(job, receive, abort, release))
+        self._jobs[job.id] = job
+
+        return job
+
+    def get(self, job_id):
+        return self._jobs.get(job_id)
+
+    async def abort(self, job_id):
+        job = self._jobs.get(job_id)
+        if job is not None and job.state == 'running':
+            job.task.cancel()
+            await asyncio.wait([job.task])
+        return job
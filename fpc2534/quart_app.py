@@ -3,23 +3,91 @@ import os
 import aiomqtt
 import asyncio
 import fpc2534 as fpc2534
+import fpc2534.analytics as analytics
+import fpc2534.broker as broker
+import fpc2534.enroll as enroll
+import fpc2534.recorder as recorder
 import functools
 import os
+import struct
+import time
 
 MAX_CHUNK_SIZE = 140
 DOWNLOAD_TIMEOUT = 120
+ABORT_TIMEOUT = 5
+MAX_BURST_COUNT = 100
 
-key = os.environ.get('FPC2534_KEY')
-if key:
-    key = bytes.fromhex(key)
-sensor = fpc2534.FPC2534(key)
+# burst stream records, each one is prefixed with its type and length
+BURST_RECORD_HEADER = struct.Struct('<BI')
+BURST_RECORD_IMAGE = 0
+BURST_RECORD_STATS = 1
+BURST_RECORD_ERROR = 2
+
+# served without taking the finite lock, a running enroll job already holds it
+UNLOCKED_PATHS = ('/sensor/identify/stats', '/sensor/enroll/')
+
+# everything below is populated by create_app(), importing this module has no side effects
+app = None
+sensor = None
+
+# when set, a separate broker process owns the sensor and this is one of many workers
+broker_path = None
+
+# optional raw frame log, and a recorded session to play back instead of the sensor
+frame_recorder = None
+replay_path = None
 
 finite_action_queue = None
-infinite_action_queue = asyncio.Queue()
-finite_action_finished = asyncio.Event()
+infinite_action_queue: asyncio.Queue = None
+finite_action_finished: asyncio.Event = None
 
 identify_queues: set[asyncio.Queue] = set()
-identification_subscriber_appeared = asyncio.Event()
+identification_subscriber_appeared: asyncio.Event = None
+
+# last config read from the sensor, None when it has to be fetched again
+system_config = None
+
+# in broker mode the broker records identify attempts instead
+identify_analytics: analytics.IdentifyAnalytics = None
+
+# only used without a broker, otherwise the broker runs enroll jobs
+enroll_jobs: enroll.EnrollJobs = None
+
+blueprint = quart.Blueprint('sensor', __name__)
+
+def create_app():
+    global app, sensor, broker_path, frame_recorder, replay_path, system_config, identify_analytics, enroll_jobs
+    global infinite_action_queue, finite_action_finished, identification_subscriber_appeared
+    
+    key = os.environ.get('FPC2534_KEY')
+    if key:
+        key = bytes.fromhex(key)
+    sensor = fpc2534.FPC2534(key)
+    
+    broker_path = os.environ.get('FPC2534_BROKER')
+    
+    # only the process owning mqtt records, with a broker that is the broker itself
+    record_path = os.environ.get('FPC2534_RECORD')
+    frame_recorder = recorder.Recorder(record_path) if record_path and not broker_path else None
+    replay_path = os.environ.get('FPC2534_REPLAY')
+    
+    system_config = None
+    
+    identify_analytics = analytics.IdentifyAnalytics(
+        int(os.environ.get('FPC2534_ANALYTICS_SIZE', analytics.DEFAULT_CAPACITY))
+    )
+    
+    enroll_jobs = enroll.EnrollJobs()
+    
+    infinite_action_queue = asyncio.Queue()
+    finite_action_finished = asyncio.Event()
+    identification_subscriber_appeared = asyncio.Event()
+    
+    app = quart.Quart(__name__)
+    app.config['MAX_CONTENT_LENGTH'] = 640000
+    app.register_blueprint(blueprint)
+    
+    return app
 
 
 async def identify_loop():
@@ -60,6 +128,7 @@ async def identify_loop():
                 break
 
             response = done.result()
+            identify_analytics.observe(response)
             
             for queue in identify_queues:
                 await queue.put(response)
@@ -68,20 +137,23 @@ async def identify_loop():
                 # allow to restart identification
                 break
 
+async def publish_request(data):
+    if frame_recorder is not None:
+        frame_recorder.record(recorder.DIRECTION_OUT, data)
+    
+    if broker_path:
+        await app.broker_client.publish(data)
+    else:
+        await app.mqtt_client.publish(broker.REQUEST_TOPIC, broker.encode_payload(data))
+
 async def send_data(data, response_loop=None):
-    await app.mqtt_client.publish(
-        'ble_devices/cb:6f:0f:38:a5:24/383f0000-7947-d815-7830-14f1584109c5/383f0001-7947-d815-7830-14f1584109c5/Set',
-        ','.join(map(str, data))
-    )
+    await publish_request(data)
     
     if response_loop is None:
         response_loop = finite_action_queue
     
     return await response_loop.get()
 
-app = quart.Quart(__name__)
-app.config['MAX_CONTENT_LENGTH'] = 640000
-
 async def loop_messages():
     async with aiomqtt.Client(
             os.environ.get('MQTT_HOST', 'localhost'), 
@@ -89,16 +161,37 @@ async def loop_messages():
         ) as client:
         print('connected')
         app.mqtt_client = client
-        await client.subscribe('ble_devices/cb:6f:0f:38:a5:24/383f0000-7947-d815-7830-14f1584109c5/383f0002-7947-d815-7830-14f1584109c5')
+        await client.subscribe(broker.RESPONSE_TOPIC)
         async for message in client.messages:
-            response = sensor.parse_response(
-                bytes(map(int, message.payload.decode().split(',')))
-            )
-                                
-            if finite_action_queue is not None:
-                await finite_action_queue.put(response)
-            else:
-                await infinite_action_queue.put(response)
+            await handle_frame(broker.decode_payload(message.payload))
+
+async def handle_frame(frame):
+    if frame_recorder is not None:
+        frame_recorder.record(recorder.DIRECTION_IN, frame)
+    
+    response = sensor.parse_response(frame)
+                        
+    if finite_action_queue is not None:
+        await finite_action_queue.put(response)
+    else:
+        await infinite_action_queue.put(response)
+
+async def _on_broker_frame(frame):
+    if finite_action_queue is not None:
+        await finite_action_queue.put(sensor.parse_response(frame))
+
+async def _on_broker_identify_frame(frame):
+    response = sensor.parse_response(frame)
+    for queue in identify_queues:
+        await queue.put(response)
+
+def _on_broker_config_changed():
+    global system_config
+    system_config = None
+
+async def _on_broker_identify_started():
+    for queue in identify_queues:
+        await queue.put({'event': 'EVENT_IDENTIFY_STARTED'})
             
 async def get_status(filtered_states=['STATE_APP_FW_READY', 'STATE_SECURE_INTERFACE']):
     response = await send_data(sensor.encode_request(fpc2534.CMD_STATUS))
@@ -118,55 +211,143 @@ async def download_data(total_size):
         yield get_response['data']
         remaining = get_response['remaining']
 
-    global finite_action_queue
-    finite_action_queue = None
-    finite_action_finished.set()
+    cleanup_request()
         
 async def respond_download(total_size):
     res = await quart.make_response(download_data(total_size), 200, {
         'Content-Length': total_size
     })
     res.timeout = DOWNLOAD_TIMEOUT
+    res.cleans_up = True
     
     return res
 
+def is_system_config(response):
+    # a failing request is answered with a status frame instead
+    return 'finger_scan_interval' in response
+
+async def get_system_config():
+    global system_config
+    
+    if system_config is None:
+        response = await send_data(sensor.get_system_config())
+        if not is_system_config(response):
+            return response
+        system_config = response
+    
+    return dict(system_config)
+
+def invalidate_system_config():
+    global system_config
+    system_config = None
+    
+    if broker_path:
+        # the other workers cache it as well
+        app.broker_client.config_changed()
+
+async def apply_system_config(changes):
+    current = await get_system_config()
+    if not is_system_config(current):
+        return current, 500
+    del current['type']
+    
+    desired = {**current, **changes}
+    if desired == current:
+        # nothing changed, spare the sensor a flash write
+        return await get_system_config()
+    
+    invalidate_system_config()
+    response = await send_data(sensor.set_system_config(**desired))
+    if response.get('app_fail_code', 'FPC_RESULT_OK') != 'FPC_RESULT_OK':
+        return response, 500
+    
+    config = await get_system_config()
+    if not is_system_config(config):
+        return config, 500
+    return config
+
+async def send_abort():
+    # the sensor or the broker may be gone, that must not keep the lock held forever
+    try:
+        async with asyncio.timeout(ABORT_TIMEOUT):
+            await send_data(sensor.abort())
+    except (TimeoutError, ConnectionError, aiomqtt.MqttError):
+        pass
+
 async def ensure_idle():
     status = await get_status()
     if len(status['states']) != 0:
         await send_data(sensor.abort())
 
-@app.before_serving
+@blueprint.before_app_serving
 async def _start_loop():
+    if broker_path:
+        app.broker_client = broker.BrokerClient(
+            _on_broker_frame,
+            _on_broker_identify_frame,
+            _on_broker_identify_started,
+            _on_broker_config_changed
+        )
+        await app.broker_client.connect(broker_path)
+        return
+    
+    if replay_path:
+        app.mqtt_client = recorder.ReplayClient(
+            replay_path,
+            handle_frame,
+            os.environ.get('FPC2534_REPLAY_REALTIME', '1') == '1'
+        )
+        asyncio.create_task(identify_loop())
+        return
+    
     asyncio.create_task(loop_messages())
     asyncio.create_task(identify_loop())
     
-@app.before_request
+@blueprint.before_app_request
 async def _before_request():
     if quart.request.url == '/sensor/identify':
         return
     
+    if quart.request.path.startswith(UNLOCKED_PATHS):
+        return
+    
     global finite_action_queue
     if finite_action_queue is not None:
         return 'Another finite request is already running', 503
     
+    if broker_path:
+        try:
+            granted = await app.broker_client.acquire()
+        except (ConnectionError, TimeoutError):
+            return 'Sensor broker unavailable', 503
+        
+        if not granted:
+            return 'Another finite request is already running', 503
+    
     finite_action_queue = asyncio.Queue()
 
 def cleanup_request():
     global finite_action_queue
     finite_action_queue = None
     
+    if broker_path:
+        app.broker_client.release()
+    
     finite_action_finished.set()
 
-@app.after_request
+@blueprint.after_app_request
 async def _after_request(response: quart.wrappers.Response):
     if quart.request.path == '/sensor/enroll':
         return response
     
+    if quart.request.path.startswith(UNLOCKED_PATHS):
+        return response
+    
     if response.status_code == 503:
         # request rejected anyway
         return response
     
-    if getattr(response, 'timeout', None) == DOWNLOAD_TIMEOUT:
+    if getattr(response, 'cleans_up', False):
         # generator, will clean up itself
         return response
     
@@ -174,23 +355,26 @@ async def _after_request(response: quart.wrappers.Response):
     
     return response
 
-@app.teardown_request
+@blueprint.teardown_app_request
 def _teardown_request(exception):
     if exception is None:
         return
     
+    if quart.request.path.startswith(UNLOCKED_PATHS):
+        return
+    
     cleanup_request()
 
-@app.get('/sensor/state')
-@app.get('/sensor/status')
+@blueprint.get('/sensor/state')
+@blueprint.get('/sensor/status')
 async def _get_status():
     return await get_status(filtered_states=[])
 
-@app.get('/sensor/templates')
+@blueprint.get('/sensor/templates')
 async def _list_templates():
     return await send_data(sensor.encode_request(fpc2534.CMD_LIST_TEMPLATES))
 
-@app.get('/sensor/templates/<int:id>')
+@blueprint.get('/sensor/templates/<int:id>')
 async def _download_template(id: int):
     await ensure_idle()
         
@@ -200,11 +384,11 @@ async def _download_template(id: int):
                         
     return await respond_download(response['total_size'])
 
-@app.delete('/sensor/templates/<int:id>')
+@blueprint.delete('/sensor/templates/<int:id>')
 async def _delete_template(id):
     return await send_data(sensor.delete_template(id))
     
-@app.put('/sensor/templates/<int:id>')
+@blueprint.put('/sensor/templates/<int:id>')
 async def _upload_demplate(id):
     data_length = int(quart.request.headers['Content-Length'])
     
@@ -232,11 +416,14 @@ async def _upload_demplate(id):
             
     return 'ok'
 
-@app.websocket('/sensor/identify')
+@blueprint.websocket('/sensor/identify')
 async def _identify():
     event_queue = asyncio.Queue()
     identify_queues.add(event_queue)
     
+    if broker_path:
+        app.broker_client.subscribe()
+    
     try:
         await quart.websocket.accept()
 
@@ -254,8 +441,21 @@ async def _identify():
                 pass
     finally:
         identify_queues.remove(event_queue)
+        
+        if broker_path:
+            app.broker_client.unsubscribe()
             
-@app.get('/sensor/image')
+@blueprint.get('/sensor/identify/stats')
+async def _get_identify_stats():
+    if broker_path:
+        try:
+            return await app.broker_client.identify_stats()
+        except (ConnectionError, TimeoutError):
+            return 'Sensor broker unavailable', 503
+    
+    return identify_analytics.stats()
+
+@blueprint.get('/sensor/image')
 async def _get_image():
     await ensure_idle()
     
@@ -277,20 +477,150 @@ async def _get_image():
     
     return await respond_download(response['size'])
 
-@app.get('/sensor/config/default')
-@app.get('/sensor/config/current')
+async def receive_response(key):
+    # events of the running capture may arrive in between, skip them.
+    # a failing command is answered with a status frame instead of its payload
+    while True:
+        response = await finite_action_queue.get()
+        if response.get('app_fail_code', 'FPC_RESULT_OK') != 'FPC_RESULT_OK':
+            raise RuntimeError(response['app_fail_code'])
+        if key in response:
+            return response
+
+async def capture_burst(count):
+    frames = []
+    error = None
+    finished = False
+    started_at = time.perf_counter()
+    
+    try:
+        for i in range(count):
+            armed_at = time.perf_counter()
+            
+            try:
+                async with asyncio.timeout(DOWNLOAD_TIMEOUT):
+                    if i == 0:
+                        await publish_request(sensor.encode_request(fpc2534.CMD_CAPTURE))
+                    
+                    # also picks up a failed answer to the early re-arm of the previous round
+                    while True:
+                        event = await receive_response('event')
+                        if event['event'] == 'EVENT_CMD_FAILED':
+                            raise RuntimeError(event['app_fail_code'])
+                        if event['event'] == 'EVENT_IMAGE_READY':
+                            break
+                        if i == 0 and event['event'] == 'EVENT_FINGER_LOST' and 'STATE_IMAGE_AVAILABLE' in event['states']:
+                            # once re-armed, a late finger lost still refers to the previous image
+                            break
+                    captured_at = time.perf_counter()
+                    
+                    await publish_request(sensor.request_image_data())
+                    image = await receive_response('size')
+                    requested_at = time.perf_counter()
+                    
+                    yield BURST_RECORD_HEADER.pack(BURST_RECORD_IMAGE, 4 + image['size'])
+                    yield struct.pack('<HH', image['width'], image['height'])
+                    
+                    remaining = image['size']
+                    while remaining > 0:
+                        await publish_request(sensor.data_get(min(MAX_CHUNK_SIZE, remaining)))
+                        chunk = await receive_response('remaining')
+                        remaining = chunk['remaining']
+                        
+                        if remaining == 0 and i + 1 < count:
+                            # let the sensor capture the next image while this one is sent out
+                            await publish_request(sensor.encode_request(fpc2534.CMD_CAPTURE))
+                        
+                        yield chunk['data']
+                    downloaded_at = time.perf_counter()
+            except (TimeoutError, RuntimeError) as e:
+                await send_abort()
+                error = str(e) or 'timeout'
+                break
+            
+            frames.append({
+                'capture': captured_at - armed_at,
+                'request': requested_at - captured_at,
+                'download': downloaded_at - requested_at,
+                'total': downloaded_at - armed_at,
+            })
+        
+        # from here on the sensor is idle, even if the client goes away
+        finished = True
+        elapsed = time.perf_counter() - started_at
+        
+        if error is not None:
+            error = quart.json.dumps({'error': error}).encode()
+            yield BURST_RECORD_HEADER.pack(BURST_RECORD_ERROR, len(error)) + error
+        
+        stats = quart.json.dumps({
+            'frames': len(frames),
+            'elapsed': elapsed,
+            'fps': len(frames) / elapsed if elapsed else 0,
+            'mean': {
+                stage: sum(frame[stage] for frame in frames) / len(frames) if frames else 0
+                for stage in ['capture', 'request', 'download', 'total']
+            },
+            'timings': frames,
+        }).encode()
+        yield BURST_RECORD_HEADER.pack(BURST_RECORD_STATS, len(stats)) + stats
+    finally:
+        try:
+            if not finished:
+                # client disconnected mid burst, disarm the capture
+                await send_abort()
+        finally:
+            cleanup_request()
+
+@blueprint.get('/sensor/image/burst')
+async def _get_image_burst():
+    count = int(quart.request.args.get('count', 10))
+    if count < 1 or count > MAX_BURST_COUNT:
+        return f'count must be between 1 and {MAX_BURST_COUNT}', 400
+    
+    await ensure_idle()
+    
+    res = await quart.make_response(capture_burst(count), 200, {
+        'Content-Type': 'application/octet-stream'
+    })
+    res.timeout = DOWNLOAD_TIMEOUT * count
+    res.cleans_up = True
+    
+    return res
+
+@blueprint.get('/sensor/config/default')
+async def _get_default_system_config():
+    return await send_data(sensor.get_system_config(default=True))
+
+@blueprint.get('/sensor/config/current')
 async def _get_system_config():
-    return await send_data(sensor.get_system_config(quart.request.url.endswith('default')))
+    config = await get_system_config()
+    if not is_system_config(config):
+        return config, 500
+    return config
 
 
-@app.route('/sensor/config', methods=['PUT', 'POST'])
-@app.route('/sensor/config/current', methods=['PUT', 'POST'])
+@blueprint.route('/sensor/config', methods=['PUT', 'POST', 'PATCH'])
+@blueprint.route('/sensor/config/current', methods=['PUT', 'POST', 'PATCH'])
 async def _set_system_config():
     payload = await quart.request.json
-    del payload['type']
-    return await send_data(sensor.set_system_config(**payload))
+    payload.pop('type', None)
+    
+    current = await get_system_config()
+    if not is_system_config(current):
+        return current, 500
+    fields = current.keys() - {'type'}
+    
+    unknown = payload.keys() - fields
+    if len(unknown) != 0:
+        return f'Unknown config fields: {", ".join(sorted(unknown))}', 400
+    
+    if quart.request.method != 'PATCH' and payload.keys() != fields:
+        return 'Full config required, use PATCH for partial updates', 400
+    
+    return await apply_system_config(payload)
 
-@app.route('/sensor/key', methods=['PUT', 'POST'])
+@blueprint.route('/sensor/key', methods=['PUT', 'POST'])
 async def _set_key():
     key = await quart.request.get_data()
     if len(key) not in [16, 32]:
@@ -298,79 +628,126 @@ async def _set_key():
     
     return await send_data(sensor.set_key(key))
 
-@app.post('/sensor/enroll')
+async def fetch_enroll_job(job_id, offset=0, wait=False):
+    if broker_path:
+        return await app.broker_client.enroll_job(job_id, offset, wait)
+    
+    job = enroll_jobs.get(job_id)
+    if job is None:
+        return None
+    if wait:
+        await job.wait(offset)
+    return job.to_json(offset)
+
+async def abort_enroll_job(job_id):
+    if broker_path:
+        return await app.broker_client.abort_enroll_job(job_id)
+    
+    job = await enroll_jobs.abort(job_id)
+    return None if job is None else job.to_json()
+
+@blueprint.post('/sensor/enroll')
 async def _enroll():
     await ensure_idle()
     template_id = quart.request.args.get('template_id')
     if template_id is not None:
         template_id = int(template_id)
+    
+    if broker_path:
+        # the broker runs the job, so it is reachable from every worker, and takes over the lock
+        try:
+            job, response = await app.broker_client.start_enroll_job(sensor.enroll_finger(template_id))
+        except (ConnectionError, TimeoutError):
+            return 'Sensor broker unavailable', 503
+        finally:
+            cleanup_request()
+        
+        if job is None:
+            return response, 500
+        return job, 202, {'Location': f'/sensor/enroll/{job["job_id"]}'}
+    
     response = await send_data(sensor.enroll_finger(template_id))
     
     if not 'STATE_ENROLL' in response['states']:
+        cleanup_request()
         return response, 500
-        
-    global finite_action_queue
     
-    stream = quart.request.headers.get('Accept') == 'text/event-stream'
+    job = enroll_jobs.start(finite_action_queue.get, send_abort, cleanup_request)
+    
+    return job.to_json(), 202, {'Location': f'/sensor/enroll/{job.id}'}
+
+@blueprint.get('/sensor/enroll/<job_id>')
+async def _get_enroll_job(job_id):
+    try:
+        offset = int(quart.request.args.get('offset', 0))
+    except ValueError:
+        return 'offset must be an integer', 400
     
-    async def generator():
-        global finite_action_queue
-        yield quart.json.dumps({'event': 'ENROLL_STARTED'})
+    try:
+        job = await fetch_enroll_job(job_id, offset)
+    except (ConnectionError, TimeoutError):
+        return 'Sensor broker unavailable', 503
+    if job is None:
+        return f'Enroll job {job_id} not found', 404
+    return job
+
+@blueprint.delete('/sensor/enroll/<job_id>')
+async def _abort_enroll_job(job_id):
+    try:
+        job = await abort_enroll_job(job_id)
+    except (ConnectionError, TimeoutError):
+        return 'Sensor broker unavailable', 503
+    if job is None:
+        return f'Enroll job {job_id} not found', 404
+    return job
+
+@blueprint.get('/sensor/enroll/<job_id>/events')
+async def _stream_enroll_job(job_id):
+    try:
+        if 'Last-Event-ID' in quart.request.headers:
+            offset = int(quart.request.headers['Last-Event-ID']) + 1
+        else:
+            offset = int(quart.request.args.get('offset', 0))
+    except ValueError:
+        return 'offset and Last-Event-ID must be integers', 400
+    
+    try:
+        job = await fetch_enroll_job(job_id, offset)
+    except (ConnectionError, TimeoutError):
+        return 'Sensor broker unavailable', 503
+    if job is None:
+        return f'Enroll job {job_id} not found', 404
+    
+    async def sse_generator():
+        nonlocal job
         while True:
-            try:
-                async with asyncio.timeout(60):
-                    response = await finite_action_queue.get()
-            except TimeoutError:
-                await send_data(sensor.abort())
-                yield quart.json.dumps({'error': 'timeout'})
-                return
-            
-            if stream:
-                yield quart.json.dumps(response)
-            else:
-                yield response
+            for i, event in enumerate(job['events']):
+                yield f'id: {job["offset"] + i}\ndata: {quart.json.dumps(event)}\n\n'.encode()
             
-            if response.get('feedback') in ['ENROLL_FEEDBACK_PROGRESS', 'ENROLL_FEEDBACK_REJECT_LOW_QUALITY', 'ENROLL_FEEDBACK_PROGRESS_IMMOBILE']:
-                # right within process
-                continue
-            
-            if response.get('event') in ['EVENT_FINGER_DETECT', 'EVENT_IMAGE_READY', 'EVENT_FINGER_LOST']:
-                # irrelevant events
-                continue
-            
-            # await FINGER_LOST event
-            await finite_action_queue.get()
-            
-            finite_action_queue = None
-            finite_action_finished.set()
+            if job['state'] != 'running':
+                yield f'event: {job["state"]}\ndata: {quart.json.dumps({"state": job["state"]})}\n\n'.encode()
+                return
             
-            break
-        
-    async def sse_generator():
-        async for data in generator():
-            yield f'data: {data}\n\n'.encode()
-        
-    if stream:
-        response = await quart.make_response(sse_generator(), 200, {
-            'Content-Type': 'text/event-stream',
-            'Cache-Control': 'no-cache',
-            'Transfer-Encoding': 'chunked'
-        })
-        response.timeout = 300
-        return response
-        
-    async for event in generator():
-        response = event
+            try:
+                job = await fetch_enroll_job(job_id, job['next_offset'], wait=True)
+            except (ConnectionError, TimeoutError):
+                # end the stream, the client resumes with Last-Event-ID
+                return
     
-    finite_action_queue = None
-    finite_action_finished.set()
-        
+    response = await quart.make_response(sse_generator(), 200, {
+        'Content-Type': 'text/event-stream',
+        'Cache-Control': 'no-cache',
+        'Transfer-Encoding': 'chunked'
+    })
+    response.timeout = enroll.ENROLL_JOB_TIMEOUT
     return response
 
-@app.post('/sensor/reset')
+@blueprint.post('/sensor/reset')
 async def _reset():
+    invalidate_system_config()
+    
     return await send_data(sensor.reset())
 
-@app.get('/sensor/selftest')
+@blueprint.get('/sensor/selftest')
 async def _selftest():
     return await send_data(sensor.self_test())
\ No newline at end of file
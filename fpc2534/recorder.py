@@ -0,0 +1,105 @@
+import mmap
+import struct
+import sys
+import time
+import fpc2534 as fpc2534
+
+MAGIC = b'FPCR\x01'
+
+# monotonic timestamp, direction, frame length
+RECORD_HEADER = struct.Struct('<dBH')
+
+DIRECTION_IN =                            0x00
+DIRECTION_OUT =                           0x01
+
+
+class Recorder:
+    def __init__(self, path):
+        self._file = open(path, 'ab')
+        if self._file.tell() == 0:
+            self._file.write(MAGIC)
+
+    def record(self, direction, frame):
+        self._file.write(RECORD_HEADER.pack(time.monotonic(), direction, len(frame)) + bytes(frame))
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+
+def read_records(path):
+    with open(path, 'rb') as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            if data[:len(MAGIC)] != MAGIC:
+                raise RuntimeError('Not a frame recording')
+
+            offset = len(MAGIC)
+            while offset + RECORD_HEADER.size <= len(data):
+                timestamp, direction, length = RECORD_HEADER.unpack_from(data, offset)
+                offset += RECORD_HEADER.size
+                if offset + length > len(data):
+                    # truncated by a crash while recording
+                    break
+                yield timestamp, direction, data[offset : offset + length]
+                offset += length
+
+
+class ReplayClient:
+    # stands in for the mqtt client. every request moves on to the next recorded
+    # outbound frame and answers with the inbound frames recorded after it
+    def __init__(self, path, on_frame, realtime=True):
+        self._on_frame = on_frame
+        self._realtime = realtime
+        self._exchanges = []
+
+        for timestamp, direction, frame in read_records(path):
+            if direction == DIRECTION_OUT:
+                self._exchanges.append((timestamp, []))
+            elif len(self._exchanges) != 0:
+                # inbound frames before the first request have nothing to answer
+                self._exchanges[-1][1].append((timestamp, frame))
+
+        self._exchanges.reverse()
+
+    async def _respond(self, sent_at, responses):
+        # asyncio is only needed for replays, reading a log should stay cheap
+        import asyncio
+
+        started_at = time.monotonic()
+        for timestamp, frame in responses:
+            delay = (timestamp - sent_at) - (time.monotonic() - started_at)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self._on_frame(frame)
+
+    async def publish(self, topic, payload):
+        import asyncio
+
+        if len(self._exchanges) == 0:
+            raise RuntimeError('Replay exhausted, no recorded response left')
+
+        sent_at, responses = self._exchanges.pop()
+
+        if self._realtime:
+            asyncio.create_task(self._respond(sent_at, responses))
+        else:
+            for _, frame in responses:
+                await self._on_frame(frame)
+
+
+def benchmark(path, key=None):
+    sensor = fpc2534.FPC2534(key)
+    count = 0
+
+    started_at = time.perf_counter()
+    for _, direction, frame in read_records(path):
+        if direction == DIRECTION_IN:
+            sensor.parse_response(frame)
+            count += 1
+    elapsed = time.perf_counter() - started_at
+
+    print(f'parsed {count} frames in {elapsed:.4f}s ({count / elapsed if elapsed else 0:.0f} frames/s)')
+
+if __name__ == '__main__':
+    key = bytes.fromhex(sys.argv[2]) if len(sys.argv) > 2 else None
+    benchmark(sys.argv[1], key)
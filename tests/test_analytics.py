@@ -0,0 +1,46 @@
+import math
+from fpc2534.analytics import IdentifyAnalytics, NO_TEMPLATE
+
+
+def test_indices_in_order_before_wrap():
+    analytics = IdentifyAnalytics(4)
+    for i in range(3):
+        analytics.record(True, i, 0)
+
+    assert list(analytics._indices()) == [0, 1, 2]
+
+
+def test_indices_after_wrap():
+    analytics = IdentifyAnalytics(4)
+    for i in range(6):
+        analytics.record(True, i, 0, timestamp=i)
+
+    indices = list(analytics._indices())
+    assert indices == [2, 3, 0, 1]
+    assert [analytics._template_ids[i] for i in indices] == [2, 3, 4, 5]
+
+
+def test_stats_only_keeps_capacity():
+    analytics = IdentifyAnalytics(4)
+    analytics.record(True, 1, 10, latency=0.5, timestamp=0)
+    analytics.record(True, 1, 11, latency=1.5, timestamp=1)
+    for i in range(4):
+        analytics.record(i % 2 == 0, 2 if i % 2 == 0 else None, 0, timestamp=3600 + i)
+
+    stats = analytics.stats()
+    assert stats['attempts'] == 4
+    assert stats['capacity'] == 4
+    assert stats['match_rate'] == 0.5
+    assert list(stats['templates']) == [2]
+    assert stats['templates'][2]['matches'] == 2
+    assert stats['templates'][2]['latency_mean'] is None
+    assert stats['hours'] == {3600: {'attempts': 4, 'matches': 2, 'match_rate': 0.5}}
+
+
+def test_missing_template_and_latency():
+    analytics = IdentifyAnalytics(2)
+    analytics.record(False, None, 0)
+
+    assert analytics._template_ids[0] == NO_TEMPLATE
+    assert math.isnan(analytics._latencies[0])
+    assert analytics.stats()['templates'] == {}
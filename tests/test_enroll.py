@@ -0,0 +1,47 @@
+from fpc2534.enroll import EnrollJob, ENROLL_JOB_LOG_SIZE
+
+
+def make_job(count):
+    job = EnrollJob()
+    for i in range(count):
+        job.append({'index': i})
+    return job
+
+
+def test_since_before_wrap():
+    job = make_job(10)
+
+    assert job.offset == 0
+    assert job.since(7) == (7, [{'index': 7}, {'index': 8}, {'index': 9}])
+    assert job.since(10) == (10, [])
+
+
+def test_offset_moves_when_log_wraps():
+    job = make_job(ENROLL_JOB_LOG_SIZE + 5)
+
+    assert job.offset == 5
+    assert len(job.events) == ENROLL_JOB_LOG_SIZE
+    assert job.since(5)[1][0] == {'index': 5}
+    assert job.since(ENROLL_JOB_LOG_SIZE + 4) == (ENROLL_JOB_LOG_SIZE + 4, [{'index': ENROLL_JOB_LOG_SIZE + 4}])
+
+
+def test_since_clamps_dropped_offsets():
+    job = make_job(ENROLL_JOB_LOG_SIZE + 5)
+
+    start, events = job.since(2)
+    assert start == 5
+    assert events[0] == {'index': 5}
+
+
+def test_to_json_next_offset():
+    job = make_job(ENROLL_JOB_LOG_SIZE + 5)
+
+    first = job.to_json()
+    assert first['offset'] == 5
+    assert first['next_offset'] == ENROLL_JOB_LOG_SIZE + 5
+
+    job.append({'index': ENROLL_JOB_LOG_SIZE + 5})
+    second = job.to_json(first['next_offset'])
+    assert second['offset'] == first['next_offset']
+    assert second['events'] == [{'index': ENROLL_JOB_LOG_SIZE + 5}]
+    assert second['next_offset'] == ENROLL_JOB_LOG_SIZE + 6
@@ -0,0 +1,52 @@
+import pytest
+from fpc2534.recorder import Recorder, read_records, MAGIC, DIRECTION_IN, DIRECTION_OUT
+
+
+def test_round_trip(tmp_path):
+    path = tmp_path / 'frames.log'
+    recorder = Recorder(path)
+    recorder.record(DIRECTION_OUT, b'\x01\x02')
+    recorder.record(DIRECTION_IN, b'\x03\x04\x05')
+    recorder.record(DIRECTION_IN, b'')
+    recorder.close()
+
+    records = list(read_records(path))
+    assert [(direction, frame) for _, direction, frame in records] == [
+        (DIRECTION_OUT, b'\x01\x02'),
+        (DIRECTION_IN, b'\x03\x04\x05'),
+        (DIRECTION_IN, b''),
+    ]
+    assert records[0][0] <= records[1][0] <= records[2][0]
+
+
+def test_appends_without_second_magic(tmp_path):
+    path = tmp_path / 'frames.log'
+    for frame in [b'\x01', b'\x02']:
+        recorder = Recorder(path)
+        recorder.record(DIRECTION_IN, frame)
+        recorder.close()
+
+    assert path.read_bytes().count(MAGIC) == 1
+    assert [frame for _, _, frame in read_records(path)] == [b'\x01', b'\x02']
+
+
+@pytest.mark.parametrize('cut', [1, 4, 8])
+def test_truncated_tail_is_skipped(tmp_path, cut):
+    path = tmp_path / 'frames.log'
+    recorder = Recorder(path)
+    recorder.record(DIRECTION_OUT, b'\x01\x02')
+    recorder.record(DIRECTION_IN, b'\x03\x04\x05\x06')
+    recorder.close()
+
+    data = path.read_bytes()
+    path.write_bytes(data[:-cut])
+
+    assert [frame for _, _, frame in read_records(path)] == [b'\x01\x02']
+
+
+def test_rejects_unknown_file(tmp_path):
+    path = tmp_path / 'frames.log'
+    path.write_bytes(b'not a recording')
+
+    with pytest.raises(RuntimeError):
+        list(read_records(path))